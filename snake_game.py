@@ -15,64 +15,89 @@ from __future__ import annotations
 
 import random
 import sys
-from dataclasses import dataclass
-from enum import Enum
-from typing import Iterable, List, Tuple
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from itertools import islice
+from typing import Deque, List, Tuple
 
 import pygame
 
 
-class Direction(Enum):
-    """Cardinal directions the snake can move."""
+class Direction(IntEnum):
+    """Cardinal directions the snake can move.
 
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
+    Members are small integers so the movement vector can be fetched by
+    indexing ``_VECTORS`` directly.
+    """
+
+    UP = 0
+    DOWN = 1
+    LEFT = 2
+    RIGHT = 3
 
     @property
     def vector(self) -> Tuple[int, int]:
-        return self.value
+        return _VECTORS[self]
 
     def is_opposite(self, other: "Direction") -> bool:
-        dx, dy = self.vector
-        ox, oy = other.vector
-        return dx == -ox and dy == -oy
+        return _OPPOSITE[self] is other
 
     @staticmethod
     def from_vector(vector: Tuple[int, int]) -> "Direction":
-        for direction in Direction:
-            if direction.vector == vector:
-                return direction
-        raise ValueError(f"Invalid direction vector: {vector}")
+        try:
+            return _VEC_TO_DIR[vector]
+        except KeyError:
+            raise ValueError(f"Invalid direction vector: {vector}") from None
+
+
+_VECTORS: Tuple[Tuple[int, int], ...] = ((0, -1), (0, 1), (-1, 0), (1, 0))
+_OPPOSITE = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+}
+_VEC_TO_DIR = {_VECTORS[direction]: direction for direction in Direction}
 
 
 Coordinate = Tuple[int, int]
 
 
+def _cell_center(x: int, y: int, cell_size: int) -> Tuple[int, int]:
+    """Return the pixel centre of grid cell ``(x, y)``."""
+    half = cell_size // 2
+    return (x * cell_size + half, y * cell_size + half)
+
+
 @dataclass
 class GameConfig:
     width: int = 600
     height: int = 400
     grid_size: int = 20
     snake_speed: int = 10
+    frame_rate: int = 60
+    grid_width: int = field(init=False)
+    grid_height: int = field(init=False)
 
-    @property
-    def grid_width(self) -> int:
-        return self.width // self.grid_size
-
-    @property
-    def grid_height(self) -> int:
-        return self.height // self.grid_size
+    def __post_init__(self) -> None:
+        self.grid_width = self.width // self.grid_size
+        self.grid_height = self.height // self.grid_size
 
 
 class Snake:
     """Encapsulates the snake state."""
 
-    def __init__(self, start: Coordinate, direction: Direction) -> None:
-        self.body: List[Coordinate] = [start]
+    def __init__(self, start: Coordinate, direction: Direction, cell_size: int) -> None:
+        self._cell_size = cell_size
+        self.body: Deque[Coordinate] = deque([start])
+        # Pixel centres of each body cell, kept in step with ``body``.
+        self.centers: Deque[Tuple[int, int]] = deque([_cell_center(*start, cell_size)])
+        self._body_set: set[Coordinate] = {start}
         self.direction = direction
         self._grow_segments = 0
+        self._collided = False
+        self.moves = 0
 
     @property
     def head(self) -> Coordinate:
@@ -81,26 +106,37 @@ class Snake:
     def queue_growth(self, amount: int = 1) -> None:
         self._grow_segments += amount
 
-    def move(self, direction: Direction) -> None:
+    def move(self, direction: Direction) -> Coordinate | None:
+        """Advance the snake one cell and return the vacated tail cell, if any."""
         if direction.is_opposite(self.direction) and len(self.body) > 1:
             direction = self.direction
 
         self.direction = direction
-        dx, dy = direction.vector
-        x, y = self.head
-        new_head = (x + dx, y + dy)
-        self.body.insert(0, new_head)
+        self.moves += 1
+        dx, dy = _VECTORS[direction]
+        x = self.head[0] + dx
+        y = self.head[1] + dy
+        new_head = (x, y)
 
+        vacated = None
         if self._grow_segments > 0:
             self._grow_segments -= 1
         else:
-            self.body.pop()
+            vacated = self.body.pop()
+            self.centers.pop()
+            self._body_set.discard(vacated)
+
+        self._collided = new_head in self._body_set
+        self.body.appendleft(new_head)
+        self.centers.appendleft(_cell_center(x, y, self._cell_size))
+        self._body_set.add(new_head)
+        return vacated
 
     def collides_with_self(self) -> bool:
-        return self.head in self.body[1:]
+        return self._collided
 
     def collides_with(self, coordinate: Coordinate) -> bool:
-        return coordinate in self.body
+        return coordinate in self._body_set
 
 
 class FoodManager:
@@ -110,18 +146,16 @@ class FoodManager:
         self.config = config
         self.position: Coordinate | None = None
 
-    def spawn(self, occupied: Iterable[Coordinate]) -> Coordinate:
-        occupied_set = set(occupied)
-        free_spaces = [
-            (x, y)
-            for x in range(self.config.grid_width)
-            for y in range(self.config.grid_height)
-            if (x, y) not in occupied_set
-        ]
-        if not free_spaces:
+    def spawn(self, occupied: bytearray, free_count: int) -> Coordinate:
+        """Place food on a random free cell of the row-major ``occupied`` grid."""
+        if free_count <= 0:
             raise RuntimeError("No free spaces left to spawn food.")
 
-        self.position = random.choice(free_spaces)
+        index = -1
+        for _ in range(random.randrange(free_count) + 1):
+            index = occupied.find(0, index + 1)
+        y, x = divmod(index, self.config.grid_width)
+        self.position = (x, y)
         return self.position
 
 
@@ -137,11 +171,26 @@ class SnakeGame:
     SNAKE_SHADOW_COLOR = pygame.Color(12, 54, 24)
     TEXT_COLOR = pygame.Color("white")
     FOOD_GLOW_COLOR = pygame.Color(255, 82, 82)
+    MAX_BODY_DECORATIONS = 40
+    MAX_BACKLOG_MS = 250
+
+    _KEYMAP = {
+        pygame.K_UP: Direction.UP,
+        pygame.K_w: Direction.UP,
+        pygame.K_DOWN: Direction.DOWN,
+        pygame.K_s: Direction.DOWN,
+        pygame.K_LEFT: Direction.LEFT,
+        pygame.K_a: Direction.LEFT,
+        pygame.K_RIGHT: Direction.RIGHT,
+        pygame.K_d: Direction.RIGHT,
+    }
 
     def __init__(self, config: GameConfig | None = None) -> None:
         self.config = config or GameConfig()
         pygame.init()
         pygame.display.set_caption("Snake")
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.WINDOWEXPOSED])
         self.surface = pygame.display.set_mode((self.config.width, self.config.height))
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont("arial", 24)
@@ -150,66 +199,63 @@ class SnakeGame:
             self.config.grid_width // 2,
             self.config.grid_height // 2,
         )
-        self.snake = Snake(start=start, direction=Direction.RIGHT)
+        self.snake = Snake(start=start, direction=Direction.RIGHT, cell_size=self.config.grid_size)
+        self._occupied = bytearray(self.config.grid_width * self.config.grid_height)
+        self._free_count = len(self._occupied)
+        self._set_occupied(start, True)
         self.food = FoodManager(self.config)
         self.score = 0
-        self.food.spawn(self.snake.body)
+        self.food.spawn(self._occupied, self._free_count)
+        self._accum_ms = 0.0
+        self._dirty: List[pygame.Rect] = [self.surface.get_rect()]
+        self._decoration_step = 1
         self._build_graphics_assets()
+        self._render_score()
+
+    def _set_occupied(self, coordinate: Coordinate, occupied: bool) -> None:
+        x, y = coordinate
+        self._occupied[y * self.config.grid_width + x] = occupied
+        self._free_count += -1 if occupied else 1
 
     def _build_graphics_assets(self) -> None:
         self.snake_head_images = self._create_oriented_surfaces(self._create_snake_head_surface())
         self.snake_tail_images = self._create_oriented_surfaces(self._create_snake_tail_surface())
         self.apple_image = self._create_apple_surface()
+        self.background = self._create_background_surface()
 
-    def _draw_grid(self) -> None:
-        for x in range(0, self.config.width, self.config.grid_size):
-            pygame.draw.line(
-                self.surface,
-                self.GRID_COLOR,
-                (x, 0),
-                (x, self.config.height),
-            )
-        for y in range(0, self.config.height, self.config.grid_size):
-            pygame.draw.line(
-                self.surface,
-                self.GRID_COLOR,
-                (0, y),
-                (self.config.width, y),
-            )
+        self.body_width = max(6, int(self.config.grid_size * 0.7))
+        # On small grids the body shadow spills out of its cell, and pygame
+        # rasterises such lines differently once clipped, so every change
+        # repaints the whole screen instead.
+        size = self.config.grid_size
+        self._cell_redraw = (self.body_width + 4) // 2 + 1 <= size - size // 2
+        # The belly stripe is the body polyline shifted down a few pixels.
+        # Drawing it through an offset view of the display reuses the cached
+        # segment centres instead of building a shifted copy every frame.
+        self._belly_offset = int(self.body_width * 0.25)
+        self._belly_layer = self.surface.subsurface(
+            pygame.Rect(0, self._belly_offset, self.config.width, self.config.height - self._belly_offset)
+        )
 
     def _draw_snake(self) -> None:
         if not self.snake.body:
             return
 
-        centers = [self._cell_center(segment) for segment in self.snake.body]
-        body_width = max(6, int(self.config.grid_size * 0.7))
+        centers = self.snake.centers
+        body_width = self.body_width
 
         if len(centers) > 1:
-            for start, end in zip(centers[:-1], centers[1:]):
-                pygame.draw.line(
-                    self.surface,
-                    self.SNAKE_SHADOW_COLOR,
-                    start,
-                    end,
-                    body_width + 4,
-                )
-                pygame.draw.line(
-                    self.surface,
-                    self.SNAKE_PRIMARY_COLOR,
-                    start,
-                    end,
-                    body_width,
-                )
-                belly_offset = int(body_width * 0.25)
-                pygame.draw.line(
-                    self.surface,
-                    self.SNAKE_BELLY_COLOR,
-                    (start[0], start[1] + belly_offset),
-                    (end[0], end[1] + belly_offset),
-                    max(2, body_width // 4),
-                )
-
-        for center in centers[1:-1]:
+            pygame.draw.lines(self.surface, self.SNAKE_SHADOW_COLOR, False, centers, body_width + 4)
+            pygame.draw.lines(self.surface, self.SNAKE_PRIMARY_COLOR, False, centers, body_width)
+            pygame.draw.lines(self._belly_layer, self.SNAKE_BELLY_COLOR, False, centers, max(2, body_width // 4))
+
+        # Long snakes only get every step-th segment decorated so the number
+        # of detail circles stays roughly constant.  The pattern is anchored
+        # to the move count so decorations travel with their segments and
+        # unchanged cells do not need redrawing.
+        step = self._decoration_step
+        first = self.snake.moves % step or step
+        for center in islice(centers, first, len(centers) - 1, step):
             pygame.draw.circle(self.surface, self.SNAKE_PRIMARY_COLOR, center, body_width // 2)
             pygame.draw.circle(
                 self.surface,
@@ -244,16 +290,25 @@ class SnakeGame:
             return
         x, y = self.food.position
         rect = self.apple_image.get_rect()
-        rect.center = self._cell_center((x, y))
+        rect.center = _cell_center(x, y, self.config.grid_size)
         self.surface.blit(self.apple_image, rect)
 
-    def _cell_center(self, coordinate: Coordinate) -> Tuple[int, int]:
+    def _cell_rect(self, coordinate: Coordinate) -> pygame.Rect:
         x, y = coordinate
-        half = self.config.grid_size // 2
-        return (
-            x * self.config.grid_size + half,
-            y * self.config.grid_size + half,
-        )
+        size = self.config.grid_size
+        if not self._cell_redraw:
+            return self.surface.get_rect()
+        return pygame.Rect(x * size, y * size, size, size)
+
+    def _grid_aligned(self, rect: pygame.Rect) -> pygame.Rect:
+        # Thick polylines rasterise differently when clipped mid-cell, so
+        # dirty regions always cover whole grid cells.
+        size = self.config.grid_size
+        left = rect.left // size * size
+        top = rect.top // size * size
+        right = -(-rect.right // size) * size
+        bottom = -(-rect.bottom // size) * size
+        return pygame.Rect(left, top, right - left, bottom - top)
 
     def _head_direction(self) -> Direction:
         if len(self.snake.body) > 1:
@@ -272,11 +327,30 @@ class SnakeGame:
     def _create_oriented_surfaces(self, base_surface: pygame.Surface) -> dict[Direction, pygame.Surface]:
         return {
             Direction.RIGHT: base_surface,
-            Direction.DOWN: pygame.transform.rotate(base_surface, -90),
-            Direction.LEFT: pygame.transform.rotate(base_surface, 180),
-            Direction.UP: pygame.transform.rotate(base_surface, 90),
+            Direction.DOWN: pygame.transform.rotate(base_surface, -90).convert_alpha(),
+            Direction.LEFT: pygame.transform.rotate(base_surface, 180).convert_alpha(),
+            Direction.UP: pygame.transform.rotate(base_surface, 90).convert_alpha(),
         }
 
+    def _create_background_surface(self) -> pygame.Surface:
+        surface = pygame.Surface((self.config.width, self.config.height)).convert()
+        surface.fill(self.BACKGROUND_COLOR)
+        for x in range(0, self.config.width, self.config.grid_size):
+            pygame.draw.line(
+                surface,
+                self.GRID_COLOR,
+                (x, 0),
+                (x, self.config.height),
+            )
+        for y in range(0, self.config.height, self.config.grid_size):
+            pygame.draw.line(
+                surface,
+                self.GRID_COLOR,
+                (0, y),
+                (self.config.width, y),
+            )
+        return surface
+
     def _create_snake_head_surface(self) -> pygame.Surface:
         size = self.config.grid_size
         surface = pygame.Surface((size, size), pygame.SRCALPHA)
@@ -318,7 +392,7 @@ class SnakeGame:
         pygame.draw.line(surface, pygame.Color(255, 120, 120), (size - 2, size // 2), (int(size * 0.92), int(size * 0.46)), 1)
         pygame.draw.line(surface, pygame.Color(255, 120, 120), (size - 2, size // 2), (int(size * 0.92), int(size * 0.54)), 1)
 
-        return surface
+        return surface.convert_alpha()
 
     def _create_snake_tail_surface(self) -> pygame.Surface:
         size = self.config.grid_size
@@ -344,7 +418,7 @@ class SnakeGame:
             (int(size * 0.55), center_y),
             max(2, body_width // 4),
         )
-        return surface
+        return surface.convert_alpha()
 
     def _create_apple_surface(self) -> pygame.Surface:
         size = self.config.grid_size
@@ -377,27 +451,28 @@ class SnakeGame:
             2,
         )
 
-        return surface
+        return surface.convert_alpha()
+
+    def _render_score(self) -> None:
+        self._score_surface = self.font.render(f"Score: {self.score}", True, self.TEXT_COLOR)
+        self._score_rect = self._score_surface.get_rect(topleft=(10, 10))
+        self._dirty.append(self._grid_aligned(self._score_rect))
 
     def _draw_score(self) -> None:
-        text_surface = self.font.render(f"Score: {self.score}", True, self.TEXT_COLOR)
-        self.surface.blit(text_surface, (10, 10))
+        self.surface.blit(self._score_surface, self._score_rect)
 
     def _handle_input(self, current_direction: Direction) -> Direction:
         direction = current_direction
-        for event in pygame.event.get():
+        for event in pygame.event.get((pygame.QUIT, pygame.KEYDOWN, pygame.WINDOWEXPOSED)):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            if event.type == pygame.WINDOWEXPOSED:
+                self._dirty.append(self.surface.get_rect())
             if event.type == pygame.KEYDOWN:
-                if event.key in (pygame.K_UP, pygame.K_w):
-                    direction = Direction.UP
-                elif event.key in (pygame.K_DOWN, pygame.K_s):
-                    direction = Direction.DOWN
-                elif event.key in (pygame.K_LEFT, pygame.K_a):
-                    direction = Direction.LEFT
-                elif event.key in (pygame.K_RIGHT, pygame.K_d):
-                    direction = Direction.RIGHT
+                mapped = self._KEYMAP.get(event.key)
+                if mapped is not None:
+                    direction = mapped
         return direction
 
     def _check_collisions(self) -> bool:
@@ -410,13 +485,15 @@ class SnakeGame:
 
     def _update_food(self) -> None:
         if self.food.position is None:
-            self.food.spawn(self.snake.body)
+            self._dirty.append(self._cell_rect(self.food.spawn(self._occupied, self._free_count)))
             return
 
         if self.snake.head == self.food.position:
             self.snake.queue_growth()
             self.score += 10
-            self.food.spawn(self.snake.body)
+            self._dirty.append(self._grid_aligned(self._score_rect))
+            self._render_score()
+            self._dirty.append(self._cell_rect(self.food.spawn(self._occupied, self._free_count)))
 
     def game_over(self) -> None:
         message = self.font.render("Game Over - Press Enter to play again", True, self.TEXT_COLOR)
@@ -424,39 +501,83 @@ class SnakeGame:
         self.surface.blit(message, rect)
         pygame.display.flip()
 
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
-                    waiting = False
-            self.clock.tick(10)
+        while True:
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.WINDOWEXPOSED:
+                pygame.display.flip()
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                break
 
         self.__init__(self.config)
 
+    def _advance(self, direction: Direction) -> bool:
+        """Run one simulation step and return ``True`` if the snake crashed."""
+        old_head = self.snake.head
+        old_tail = self.snake.body[-1]
+        vacated = self.snake.move(direction)
+        if self._check_collisions():
+            return True
+
+        if vacated is not None:
+            self._set_occupied(vacated, False)
+        self._set_occupied(self.snake.head, True)
+
+        # Only the cells at either end of the snake change during a move.
+        for coordinate in (old_head, self.snake.head, old_tail, self.snake.body[-1]):
+            self._dirty.append(self._cell_rect(coordinate))
+        step = max(1, len(self.snake.body) // self.MAX_BODY_DECORATIONS)
+        if step != self._decoration_step:
+            self._decoration_step = step
+            self._dirty.append(self.surface.get_rect())
+
+        self._update_food()
+        return False
+
+    def _redraw_dirty(self) -> None:
+        """Repaint the dirty regions of the frame and present only those."""
+        screen = self.surface.get_rect()
+        if screen in self._dirty:
+            self._dirty[:] = [screen]
+        for rect in self._dirty:
+            self.surface.set_clip(rect)
+            self._belly_layer.set_clip(rect.move(0, -self._belly_offset))
+            self.surface.blit(self.background, rect, rect)
+            self._draw_snake()
+            self._draw_food()
+            self._draw_score()
+        self.surface.set_clip(None)
+        self._belly_layer.set_clip(None)
+
+        pygame.display.update(self._dirty)
+        self._dirty.clear()
+
     def run(self) -> None:
         direction = self.snake.direction
+        step_ms = 1000 / self.config.snake_speed
         while True:
             direction = self._handle_input(direction)
-            self.snake.move(direction)
 
-            if self._check_collisions():
+            # Input and drawing run at the frame rate; the snake itself moves
+            # once for every full simulation step of accumulated time.
+            crashed = False
+            while self._accum_ms >= step_ms:
+                self._accum_ms -= step_ms
+                if self._advance(direction):
+                    crashed = True
+                    break
+            if crashed:
                 self.game_over()
                 direction = self.snake.direction
                 continue
 
-            self._update_food()
-
-            self.surface.fill(self.BACKGROUND_COLOR)
-            self._draw_grid()
-            self._draw_snake()
-            self._draw_food()
-            self._draw_score()
-
-            pygame.display.flip()
-            self.clock.tick(self.config.snake_speed)
+            if self._dirty:
+                self._redraw_dirty()
+            self._accum_ms += self.clock.tick(self.config.frame_rate)
+            # After a stall, drop the backlog rather than fast-forwarding.
+            self._accum_ms = min(self._accum_ms, max(step_ms, self.MAX_BACKLOG_MS))
 
 
 def main() -> None: